@@ -24,29 +24,32 @@ This script demonstrates a basic "happy path" user journey with Hedera payments:
 6. Selecting a fulfillment option.
 7. Completing the checkout by processing a Hedera HBAR payment.
 
+By default steps 2-4 are sent as a single combined update; pass --no_batch to
+issue them one request at a time.
+
 Usage:
   export HEDERA_CUSTOMER_ACCOUNT_ID=0.0.XXXXX
   export HEDERA_CUSTOMER_PRIVATE_KEY=0xabcd...
   uv run simple_happy_path_client.py --server_url=http://localhost:8182
 """
 
+from __future__ import annotations
+
 import argparse
+import asyncio
 import base64
-import json
+import contextlib
+import functools
 import logging
 import os
 from pathlib import Path
+import re
+from typing import TYPE_CHECKING, TextIO
 import uuid
 
 import httpx
-from dotenv import load_dotenv
-from hiero_sdk_python import (
-  AccountId,
-  Client,
-  Network,
-  PrivateKey,
-  TransferTransaction,
-)
+import orjson
+from pydantic import TypeAdapter
 from ucp_sdk.models.schemas.shopping import checkout_create_req
 from ucp_sdk.models.schemas.shopping import checkout_update_req
 from ucp_sdk.models.schemas.shopping import payment_create_req
@@ -56,11 +59,21 @@ from ucp_sdk.models.schemas.shopping.types import item_update_req
 from ucp_sdk.models.schemas.shopping.types import line_item_create_req
 from ucp_sdk.models.schemas.shopping.types import line_item_update_req
 
+if TYPE_CHECKING:
+  from hiero_sdk_python import AccountId, Client, PrivateKey
+
+# Serializers for the request models, built once at import and shared by
+# every step that dumps a checkout payload.
+CHECKOUT_CREATE_ADAPTER = TypeAdapter(checkout_create_req.CheckoutCreateRequest)
+CHECKOUT_UPDATE_ADAPTER = TypeAdapter(checkout_update_req.CheckoutUpdateRequest)
+
 
 def load_env_file() -> None:
   """Load environment variables from .env file if it exists."""
   env_path = Path(__file__).parent / ".env"
   if env_path.exists():
+    from dotenv import load_dotenv
+
     load_dotenv(env_path)
 
 
@@ -81,32 +94,65 @@ def get_hedera_merchant_account(discovery_data: dict) -> str | None:
   return None
 
 
-def create_hedera_payment(
+def track_fulfillment_ids(
+  checkout_data: dict,
+  replacements: dict[str, str],
+  extractions: dict[str, str],
+) -> None:
+  """Record the first fulfillment method and destination IDs for export.
+
+  Args:
+      checkout_data: The checkout response from the merchant.
+      replacements: Map of actual values to export variable names.
+      extractions: Map of export variable names to jq expressions.
+  """
+  if not checkout_data.get("fulfillment") or not checkout_data[
+    "fulfillment"
+  ].get("methods"):
+    return
+
+  method_id = checkout_data["fulfillment"]["methods"][0]["id"]
+
+  replacements[method_id] = "FULFILLMENT_METHOD_ID"
+
+  extractions["FULFILLMENT_METHOD_ID"] = ".fulfillment.methods[0].id"
+
+  # Also destinations
+
+  destinations = checkout_data["fulfillment"]["methods"][0].get(
+    "destinations", []
+  )
+
+  if destinations:
+    # Assuming addr_1 is first
+
+    dest_id = destinations[0]["id"]
+
+    replacements[dest_id] = "DESTINATION_ID"
+
+    extractions["DESTINATION_ID"] = ".fulfillment.methods[0].destinations[0].id"
+
+
+def create_hedera_client(
   customer_account_id: str,
   customer_private_key: str,
-  merchant_account_id: str,
-  amount_hbar: float,
-  checkout_id: str,
   network_name: str = "testnet",
-) -> str:
-  """Create and sign a Hedera transfer transaction.
+) -> tuple[Client, AccountId, PrivateKey]:
+  """Create a Hedera client with the customer as operator.
 
   Args:
       customer_account_id: The customer's Hedera account ID (e.g., 0.0.12345).
       customer_private_key: The customer's private key (hex format with 0x).
-      merchant_account_id: The merchant's Hedera account ID.
-      amount_hbar: The amount to transfer in HBAR.
-      checkout_id: The checkout session ID for memo.
       network_name: The Hedera network (testnet or mainnet).
 
   Returns:
-      Base64-encoded signed transaction bytes.
+      The configured client, the customer account ID and private key.
   """
-  logger = logging.getLogger(__name__)
+  # Deferred so runs that fail early never pay for the SDK's gRPC imports
+  from hiero_sdk_python import AccountId, Client, Network, PrivateKey
 
-  # Parse account IDs
+  # Parse account ID
   customer_acct = AccountId.from_string(customer_account_id)
-  merchant_acct = AccountId.from_string(merchant_account_id)
 
   # Parse private key
   private_key = PrivateKey.from_string_ecdsa(customer_private_key)
@@ -124,14 +170,40 @@ def create_hedera_payment(
 
   client = Client(network)
   client.set_operator(customer_acct, private_key)
+  return client, customer_acct, private_key
+
+
+def create_hedera_payment(
+  client: Client,
+  customer_acct: AccountId,
+  private_key: PrivateKey,
+  merchant_account_id: str,
+  amount_tinybars: int,
+  checkout_id: str,
+) -> str:
+  """Create and sign a Hedera transfer transaction.
+
+  Args:
+      client: Hedera client from `create_hedera_client`.
+      customer_acct: The customer's Hedera account ID.
+      private_key: The customer's private key.
+      merchant_account_id: The merchant's Hedera account ID.
+      amount_tinybars: The amount to transfer in tinybars.
+      checkout_id: The checkout session ID for memo.
+
+  Returns:
+      Base64-encoded signed transaction bytes.
+  """
+  from hiero_sdk_python import AccountId, TransferTransaction
 
-  # Convert HBAR to tinybars (1 HBAR = 100,000,000 tinybars)
-  amount_tinybars = int(amount_hbar * 100_000_000)
+  logger = logging.getLogger(__name__)
+
+  merchant_acct = AccountId.from_string(merchant_account_id)
 
   logger.info(
     "Transfer: %.2f HBAR from %s to %s",
-    amount_hbar,
-    customer_account_id,
+    amount_tinybars / 100_000_000,
+    customer_acct,
     merchant_account_id,
   )
 
@@ -152,25 +224,104 @@ def create_hedera_payment(
 
 def get_headers() -> dict[str, str]:
   """Generate necessary headers for UCP requests."""
+  # Both v4 UUIDs come from a single urandom read.
+  raw = os.urandom(32)
   return {
     "request-signature": "test",
-    "idempotency-key": str(uuid.uuid4()),
-    "request-id": str(uuid.uuid4()),
+    "idempotency-key": str(uuid.UUID(bytes=raw[:16], version=4)),
+    "request-id": str(uuid.UUID(bytes=raw[16:], version=4)),
   }
 
 
-def remove_none_values(obj):
-  """Recursively remove keys with None values from a dictionary or list."""
-  if isinstance(obj, dict):
-    return {k: remove_none_values(v) for k, v in obj.items() if v is not None}
-  elif isinstance(obj, list):
-    return [remove_none_values(v) for v in obj]
-  else:
+def build_json_request(
+  client: httpx.AsyncClient,
+  method: str,
+  url: str,
+  body: bytes,
+  headers: dict[str, str],
+) -> httpx.Request:
+  """Build a request carrying an already serialized JSON body.
+
+  Args:
+      client: The client the request will be sent with.
+      method: The HTTP method.
+      url: The URL, relative to the client's base URL.
+      body: The JSON-encoded request body.
+      headers: The per-request UCP headers.
+
+  Returns:
+      The request, ready for `client.send`.
+  """
+  return client.build_request(
+    method,
+    url,
+    content=body,
+    headers={**headers, "Content-Type": "application/json"},
+  )
+
+
+def parse_json(response: httpx.Response):
+  """Parse a JSON response body straight from its raw bytes.
+
+  Unlike `response.json()`, this skips decoding the body to `str` first.
+  """
+  return orjson.loads(response.content)
+
+
+def clean_json(obj, replacements: dict[str, str] | None = None):
+  """Prepare a JSON value for the export log in a single walk.
+
+  Removes keys with None values from dictionaries at any depth and, when
+  `replacements` is given, swaps string values found in it for their
+  `$VARIABLE` placeholder. Walks the tree with an explicit stack instead of
+  recursing, and returns a copy so the caller's data is left untouched.
+  """
+  replacements = replacements or {}
+
+  if isinstance(obj, str) and obj in replacements:
+    return f"${replacements[obj]}"
+  if not isinstance(obj, (dict, list)):
     return obj
 
+  result = {} if isinstance(obj, dict) else []
+  stack = [(obj, result)]
+  while stack:
+    src, dst = stack.pop()
+    is_dict = isinstance(src, dict)
+    for key, value in src.items() if is_dict else enumerate(src):
+      if value is None and is_dict:
+        continue
+      if isinstance(value, dict):
+        value_copy = {}
+        stack.append((value, value_copy))
+      elif isinstance(value, list):
+        value_copy = []
+        stack.append((value, value_copy))
+      elif isinstance(value, str) and value in replacements:
+        value_copy = f"${replacements[value]}"
+      else:
+        value_copy = value
+      if is_dict:
+        dst[key] = value_copy
+      else:
+        dst.append(value_copy)
+  return result
+
+
+@functools.lru_cache(maxsize=16)
+def replacement_pattern(values: tuple[str, ...]) -> re.Pattern[str]:
+  """Compile a single regex matching any of the given literal values.
+
+  Longer values are tried first so a value that is a prefix of another one
+  (e.g. the server URL) does not win the match.
+  """
+  return re.compile(
+    "|".join(re.escape(v) for v in sorted(values, key=len, reverse=True))
+  )
+
 
 def log_interaction(
-  filename: str,
+  f: TextIO,
   method: str,
   url: str,
   headers: dict[str, str],
@@ -179,71 +330,99 @@ def log_interaction(
   step_description: str,
   replacements: dict[str, str] | None = None,
   extractions: dict[str, str] | None = None,
+  response_json: object | None = None,
 ):
-  """Log the request and response to a markdown file."""
+  """Log the request and response to an open markdown file.
+
+  Pass `response_json` when the caller has already parsed the response body,
+  so it is not decoded a second time here.
+  """
   replacements = replacements or {}
 
   extractions = extractions or {}
 
-  with Path(filename).open("a", encoding="utf-8") as f:
-    f.write(f"## {step_description}\n\n")
-
-    # --- Request (Curl) ---
-    # Apply replacements to URL
-    display_url = url
-    for val, var_name in replacements.items():
-      if val in display_url:
-        display_url = display_url.replace(val, f"${var_name}")
-
-    curl_cmd = f"export RESPONSE=$(curl -s -X {method} {display_url} \\\n"
-
-    # Headers
-    # We generally don't tokenize headers in this simple script,
-    # but could if needed.
-    for k, v in headers.items():
-      curl_cmd += f"  -H '{k}: {v}' \\\n"
-
-    # Body
-    if json_body:
-      curl_cmd += "  -H 'Content-Type: application/json' \\\n"
-      clean_body = remove_none_values(json_body)
-      json_str = json.dumps(clean_body, indent=2)
-
-      # Apply replacements to body
-      for val, var_name in replacements.items():
-        # Simple string replacement - safer to do on the JSON string
-        # than traversing the dict for this doc-gen purpose.
-        if val in json_str:
-          json_str = json_str.replace(val, f"${var_name}")
-
-      curl_cmd += f"  -d '{json_str}')\n"
-    else:
-      curl_cmd = curl_cmd.rstrip(" \\\n") + ")\n"
+  pattern = replacement_pattern(tuple(replacements)) if replacements else None
 
-    f.write("### Request\n\n```bash\n" + curl_cmd + "```\n\n")
+  def tokenize(text: str) -> str:
+    if pattern is None:
+      return text
+    return pattern.sub(lambda m: f"${replacements[m.group(0)]}", text)
 
-    # --- Response ---
+  f.write(f"## {step_description}\n\n")
 
-    f.write("### Response\n\n")
+  # --- Request (Curl) ---
+  # Apply replacements to URL
+  display_url = tokenize(url)
 
-    try:
-      resp_json = response.json()
-      clean_resp = remove_none_values(resp_json)
-      f.write("```json\n" + json.dumps(clean_resp, indent=2) + "\n```\n\n")
-    except json.JSONDecodeError:
-      f.write(f"```\n{response.text}\n```\n\n")
-
-    # --- Extract Variables ---
-    if extractions:
-      f.write("### Extract Variables\n\n```bash\n")
-      for var_name, jq_expr in extractions.items():
-        # We assume the user has the response in a variable or pipe.
-        # For the snippet, we'll assume they pipe the previous curl output.
-        f.write(f"export {var_name}=$(echo $RESPONSE | jq -r '{jq_expr}')\n")
-      f.write("```\n\n")
-
-
-def main() -> None:
+  curl_cmd = f"export RESPONSE=$(curl -s -X {method} {display_url} \\\n"
+
+  # Headers
+  # We generally don't tokenize headers in this simple script,
+  # but could if needed.
+  for k, v in headers.items():
+    curl_cmd += f"  -H '{k}: {v}' \\\n"
+
+  # Body
+  if json_body:
+    curl_cmd += "  -H 'Content-Type: application/json' \\\n"
+    # Apply replacements to body values while walking it, rather than
+    # searching the serialized string afterwards.
+    clean_body = clean_json(json_body, replacements)
+    json_str = orjson.dumps(clean_body, option=orjson.OPT_INDENT_2).decode()
+
+    curl_cmd += f"  -d '{json_str}')\n"
+  else:
+    curl_cmd = curl_cmd.rstrip(" \\\n") + ")\n"
+
+  f.write("### Request\n\n```bash\n" + curl_cmd + "```\n\n")
+
+  # --- Response ---
+
+  f.write("### Response\n\n")
+
+  try:
+    resp_json = (
+      response_json
+      if response_json is not None
+      else parse_json(response)
+    )
+    clean_resp = clean_json(resp_json)
+    resp_str = orjson.dumps(clean_resp, option=orjson.OPT_INDENT_2).decode()
+    f.write("```json\n" + resp_str + "\n```\n\n")
+  except orjson.JSONDecodeError:
+    f.write(f"```\n{response.text}\n```\n\n")
+
+  # --- Extract Variables ---
+  if extractions:
+    f.write("### Extract Variables\n\n```bash\n")
+    for var_name, jq_expr in extractions.items():
+      # We assume the user has the response in a variable or pipe.
+      # For the snippet, we'll assume they pipe the previous curl output.
+      f.write(f"export {var_name}=$(echo $RESPONSE | jq -r '{jq_expr}')\n")
+    f.write("```\n\n")
+
+
+async def log_interaction_after(
+  previous: asyncio.Task | None,
+  *args,
+  **kwargs,
+) -> None:
+  """Run `log_interaction` in a worker thread once `previous` has finished.
+
+  Chaining each write onto the previous one keeps the markdown sections in
+  step order while the next HTTP request is already in flight. A failed
+  write is logged rather than raised, so it does not take down the later
+  sections chained behind it.
+  """
+  if previous is not None:
+    await previous
+  try:
+    await asyncio.to_thread(log_interaction, *args, **kwargs)
+  except Exception:  # pylint: disable=broad-exception-caught
+    logging.getLogger(__name__).exception("Failed to export interaction")
+
+
+async def main() -> None:
   """Run the happy path client with Hedera payment."""
   # Load .env file first
   load_env_file()
@@ -262,6 +441,15 @@ def main() -> None:
     help="Path to export requests and responses as markdown.",
   )
 
+  parser.add_argument(
+    "--no_batch",
+    action="store_true",
+    help=(
+      "Send the add items, discount and fulfillment updates as separate"
+      " requests instead of one combined update."
+    ),
+  )
+
   parser.add_argument(
     "--hedera_customer_account_id",
     default=os.environ.get("HEDERA_CUSTOMER_ACCOUNT_ID"),
@@ -304,28 +492,67 @@ def main() -> None:
 
   logger.info("Using Hedera payment with account: %s", hedera_customer_account)
 
-  client = httpx.Client(base_url=args.server_url)
+  # Closes the HTTP client and the export file however the run ends
+  resources = contextlib.AsyncExitStack()
+  export_file: TextIO | None = None
+
+  # Track dynamic values to replace in subsequent requests
+  # Map: actual_value -> variable_name
+  global_replacements: dict[str, str] = {args.server_url: "SERVER_URL"}
 
-  # Clear the export file if it exists
-  if args.export_requests_to:
-    with Path(args.export_requests_to).open("w", encoding="utf-8") as f:
-      f.write("# UCP Happy Path Interaction Log\n\n")
-      f.write("### Configuration\n\n")
-      f.write(f"```bash\nexport SERVER_URL={args.server_url}\n```\n\n")
-      f.write(
+  # Markdown export runs in the background, chained so writes stay ordered.
+  pending_log: asyncio.Task | None = None
+
+  def export_interaction(*log_args, replacements, **log_kwargs) -> None:
+    nonlocal pending_log
+    pending_log = asyncio.create_task(
+      log_interaction_after(
+        pending_log,
+        export_file,
+        *log_args,
+        # Snapshot, since later steps keep adding to the shared mapping.
+        replacements=dict(replacements),
+        **log_kwargs,
+      )
+    )
+
+  try:
+    # One pooled client for the whole run so every step reuses the same
+    # keep-alive connection instead of paying a new TCP/TLS handshake.
+    client = await resources.enter_async_context(
+      httpx.AsyncClient(
+        base_url=args.server_url,
+        http2=True,
+        limits=httpx.Limits(
+          max_keepalive_connections=8, keepalive_expiry=30.0
+        ),
+        timeout=httpx.Timeout(10.0, connect=5.0),
+      )
+    )
+
+    # Open the export file once for the whole run, clearing it if it exists
+    if args.export_requests_to:
+      # Closed by `resources` in the finally block below; ruff does not treat
+      # an exit stack held in a variable as a context manager.
+      export_file = resources.enter_context(
+        Path(args.export_requests_to).open(  # noqa: SIM115
+          "w", encoding="utf-8", buffering=1 << 16
+        )
+      )
+      export_file.write("# UCP Happy Path Interaction Log\n\n")
+      export_file.write("### Configuration\n\n")
+      export_file.write(
+        f"```bash\nexport SERVER_URL={args.server_url}\n```\n\n"
+      )
+      export_file.write(
         "> **Note:** In the bash snippets below, `jq` is used to extract"
         " values from the JSON response.\n"
       )
-      f.write(
+      export_file.write(
         "> It is assumed that the response body of the previous `curl`"
         " command is captured in a variable named `$RESPONSE`.\n\n"
       )
 
-  # Track dynamic values to replace in subsequent requests
-  # Map: actual_value -> variable_name
-  global_replacements: dict[str, str] = {args.server_url: "SERVER_URL"}
-
-  try:
     # ==========================================================================
 
     # STEP 0: Discovery
@@ -336,11 +563,47 @@ def main() -> None:
 
     url = "/.well-known/ucp"
 
-    response = client.get(url)
+    # Start discovery now and do the local setup while it is in flight.
+    discovery_task = asyncio.create_task(client.get(url))
+
+    # Set up the Hedera client once, off the payment step's critical path
+    try:
+      hedera_client, hedera_customer_acct, hedera_private_key = (
+        await asyncio.to_thread(
+          create_hedera_client,
+          hedera_customer_account,
+          hedera_customer_key,
+          hedera_network,
+        )
+      )
+    except Exception:  # pylint: disable=broad-exception-caught
+      logger.exception("Invalid Hedera configuration:")
+      discovery_task.cancel()
+      return
+
+    # The STEP 1 models that do not depend on the discovery response.
+    # We start with one item: "Red Rose"
+
+    item1 = item_create_req.ItemCreateRequest(
+      id="bouquet_roses", title="Red Rose"
+    )
+
+    line_item1 = line_item_create_req.LineItemCreateRequest(
+      quantity=1, item=item1
+    )
+
+    # We include the buyer to trigger address lookup on the server
+
+    buyer_req = buyer.Buyer(full_name="John Doe", email="john.doe@example.com")
+
+    response = await discovery_task
+
+    response_json = (
+      parse_json(response) if response.status_code == 200 else None
+    )
 
     if args.export_requests_to:
-      log_interaction(
-        args.export_requests_to,
+      export_interaction(
         "GET",
         f"{args.server_url}{url}",
         {},
@@ -348,6 +611,7 @@ def main() -> None:
         response,
         "Step 0: Discovery",
         replacements=global_replacements,
+        response_json=response_json,
       )
 
     if response.status_code != 200:
@@ -355,7 +619,7 @@ def main() -> None:
 
       return
 
-    discovery_data = response.json()
+    discovery_data = response_json
 
     supported_handlers = discovery_data.get("payment", {}).get("handlers", [])
 
@@ -384,16 +648,6 @@ def main() -> None:
 
     logger.info("\nSTEP 1: Creating a new Checkout Session...")
 
-    # We start with one item: "Red Rose"
-
-    item1 = item_create_req.ItemCreateRequest(
-      id="bouquet_roses", title="Red Rose"
-    )
-
-    line_item1 = line_item_create_req.LineItemCreateRequest(
-      quantity=1, item=item1
-    )
-
     # We initialize the payment section with the handlers we discovered.
 
     # We do NOT select an instrument yet (selected_instrument_id=None).
@@ -404,10 +658,6 @@ def main() -> None:
       handlers=supported_handlers,  # Pass back what we found (or a subset)
     )
 
-    # We include the buyer to trigger address lookup on the server
-
-    buyer_req = buyer.Buyer(full_name="John Doe", email="john.doe@example.com")
-
     create_payload = checkout_create_req.CheckoutCreateRequest(
       currency="USD",
       line_items=[line_item1],
@@ -419,17 +669,19 @@ def main() -> None:
 
     url = "/checkout-sessions"
 
-    json_body = create_payload.model_dump(
-      mode="json", by_alias=True, exclude_none=True
+    # Serialize with pydantic-core and send the bytes as-is; the dict is only
+    # needed for the export log.
+    body = CHECKOUT_CREATE_ADAPTER.dump_json(
+      create_payload, by_alias=True, exclude_none=True
     )
 
-    response = client.post(
-      url,
-      json=json_body,
-      headers=headers,
+    json_body = orjson.loads(body) if args.export_requests_to else None
+
+    response = await client.send(
+      build_json_request(client, "POST", url, body, headers)
     )
 
-    checkout_data = response.json()
+    checkout_data = parse_json(response)
 
     checkout_id = checkout_data.get("id")
 
@@ -449,8 +701,7 @@ def main() -> None:
       extractions["LINE_ITEM_1_ID"] = ".line_items[0].id"
 
     if args.export_requests_to:
-      log_interaction(
-        args.export_requests_to,
+      export_interaction(
         "POST",
         f"{args.server_url}{url}",
         headers,
@@ -459,6 +710,7 @@ def main() -> None:
         "Step 1: Create Checkout Session",
         replacements=global_replacements,
         extractions=extractions,
+        response_json=checkout_data,
       )
 
     if response.status_code not in [200, 201]:
@@ -478,7 +730,15 @@ def main() -> None:
 
     # ==========================================================================
 
-    logger.info("\nSTEP 2: Adding a second item (Ceramic Pot)...")
+    batch = not args.no_batch
+
+    if batch:
+      logger.info(
+        "\nSTEP 2: Adding a second item (Ceramic Pot), applying discount and"
+        " triggering fulfillment in one update..."
+      )
+    else:
+      logger.info("\nSTEP 2: Adding a second item (Ceramic Pot)...")
 
     # Update Item 1 (Roses) - Keep quantity 1
 
@@ -516,17 +776,27 @@ def main() -> None:
 
     url = f"/checkout-sessions/{checkout_id}"
 
-    json_body = update_payload.model_dump(
-      mode="json", by_alias=True, exclude_none=True
+    body = CHECKOUT_UPDATE_ADAPTER.dump_json(
+      update_payload, by_alias=True, exclude_none=True
     )
 
-    response = client.put(
-      url,
-      json=json_body,
-      headers=headers,
+    json_body = None
+
+    if batch:
+      # The server applies line items, discounts and fulfillment from a
+      # single update, so fold STEPs 3 and 4 into this request.
+      json_body = orjson.loads(body)
+      json_body["discounts"] = {"codes": ["10OFF"]}
+      json_body["fulfillment"] = {"methods": [{"type": "shipping"}]}
+      body = orjson.dumps(json_body)
+    elif args.export_requests_to:
+      json_body = orjson.loads(body)
+
+    response = await client.send(
+      build_json_request(client, "PUT", url, body, headers)
     )
 
-    checkout_data = response.json()
+    checkout_data = parse_json(response)
 
     extractions = {}
 
@@ -541,22 +811,32 @@ def main() -> None:
 
       extractions["LINE_ITEM_2_ID"] = ".line_items[1].id"
 
+    if batch:
+      track_fulfillment_ids(checkout_data, global_replacements, extractions)
+
     if args.export_requests_to:
-      log_interaction(
-        args.export_requests_to,
+      export_interaction(
         "PUT",
         f"{args.server_url}{url}",
         headers,
         json_body,
         response,
-        "Step 2: Add Items (Update Checkout)",
+        (
+          "Step 2: Add Items, Apply Discount and Trigger Fulfillment"
+          if batch
+          else "Step 2: Add Items (Update Checkout)"
+        ),
         replacements=global_replacements,
         extractions=extractions,
+        response_json=checkout_data,
       )
 
     if response.status_code != 200:
       logger.error("Failed to add items: %s", response.text)
 
+      if batch:
+        logger.error("Retry with --no_batch to send the updates separately.")
+
       return
 
     logger.info("Successfully added items.")
@@ -565,99 +845,82 @@ def main() -> None:
 
     logger.info("Item Count: %d", len(checkout_data["line_items"]))
 
-    # ==========================================================================
-
-    # STEP 3: Apply Discount
-
-    # ==========================================================================
-
-    logger.info("\nSTEP 3: Applying Discount (10%% OFF)...")
-
-    # Re-construct line items for update
+    # The line items stay the same from here on, so build and serialize the
+    # base update once. Later steps only layer their own fields on top.
 
     # We need IDs from the current session
 
-    li_1 = next(
-      li
-      for li in checkout_data["line_items"]
-      if li["item"]["id"] == "bouquet_roses"
-    )
+    li_by_item = {li["item"]["id"]: li for li in checkout_data["line_items"]}
 
-    li_2 = next(
-      li
-      for li in checkout_data["line_items"]
-      if li["item"]["id"] == "pot_ceramic"
-    )
+    li_1_id = li_by_item["bouquet_roses"]["id"]
 
-    item1_update = item_update_req.ItemUpdateRequest(
-      id="bouquet_roses", title="Red Rose"
-    )
+    li_2_id = li_by_item["pot_ceramic"]["id"]
 
-    line_item1_update = line_item_update_req.LineItemUpdateRequest(
-      id=li_1["id"],
-      quantity=1,
-      item=item1_update,
-    )
-
-    item2_update = item_update_req.ItemUpdateRequest(
-      id="pot_ceramic", title="Ceramic Pot"
+    # Reuse the already validated STEP 2 models; only the line item IDs
+    # change, so copy them instead of constructing and validating new ones.
+    base_update = update_payload.model_copy(
+      update={
+        "line_items": [
+          line_item1_update.model_copy(update={"id": li_1_id}),
+          line_item2_update.model_copy(update={"id": li_2_id}),
+        ]
+      }
     )
 
-    line_item2_update = line_item_update_req.LineItemUpdateRequest(
-      id=li_2["id"],
-      quantity=2,
-      item=item2_update,
+    base_dict = orjson.loads(
+      CHECKOUT_UPDATE_ADAPTER.dump_json(
+        base_update, by_alias=True, exclude_none=True
+      )
     )
 
-    # Construct the Update Payload
-
-    update_payload = checkout_update_req.CheckoutUpdateRequest(
-      id=checkout_id,
-      line_items=[line_item1_update, line_item2_update],
-      currency=checkout_data["currency"],
-      payment=checkout_data["payment"],
-    )
+    # ==========================================================================
 
-    update_dict = update_payload.model_dump(
-      mode="json", by_alias=True, exclude_none=True
-    )
+    # STEP 3: Apply Discount
 
-    update_dict["discounts"] = {"codes": ["10OFF"]}
+    # ==========================================================================
 
-    headers = get_headers()
+    # Already sent with the combined STEP 2 update when batching
+    if not batch:
+      logger.info("\nSTEP 3: Applying Discount (10%% OFF)...")
 
-    url = f"/checkout-sessions/{checkout_id}"
+      headers = get_headers()
 
-    json_body = update_dict
+      json_body = {**base_dict, "discounts": {"codes": ["10OFF"]}}
 
-    response = client.put(
-      url,
-      json=json_body,
-      headers=headers,
-    )
+      response = await client.send(
+        build_json_request(
+          client, "PUT", url, orjson.dumps(json_body), headers
+        )
+      )
 
-    if args.export_requests_to:
-      log_interaction(
-        args.export_requests_to,
-        "PUT",
-        f"{args.server_url}{url}",
-        headers,
-        json_body,
-        response,
-        "Step 3: Apply Discount",
-        replacements=global_replacements,
+      response_json = (
+        parse_json(response) if response.status_code == 200 else None
       )
 
-    if response.status_code != 200:
-      logger.error("Failed to apply discount: %s", response.text)
+      if args.export_requests_to:
+        export_interaction(
+          "PUT",
+          f"{args.server_url}{url}",
+          headers,
+          json_body,
+          response,
+          "Step 3: Apply Discount",
+          replacements=global_replacements,
+          response_json=response_json,
+        )
 
-      return
+      if response.status_code != 200:
+        logger.error("Failed to apply discount: %s", response.text)
 
-    checkout_data = response.json()
+        return
 
-    logger.info("Successfully applied discount.")
+      checkout_data = response_json
 
-    logger.info("New Total: %s cents", checkout_data["totals"][-1]["amount"])
+      logger.info("Successfully applied discount.")
+
+      logger.info(
+        "New Total: %s cents", checkout_data["totals"][-1]["amount"]
+      )
 
     discounts_applied = checkout_data.get("discounts", {}).get("applied", [])
 
@@ -675,107 +938,42 @@ def main() -> None:
 
     # ==========================================================================
 
-    logger.info("\nSTEP 4: Selecting Fulfillment Option...")
-
-    # Ensure fulfillment options are generated
+    # Ensure fulfillment options are generated (the combined STEP 2 update
+    # normally already returned them)
 
     if not checkout_data.get("fulfillment") or not checkout_data[
       "fulfillment"
     ].get("methods"):
-      logger.info("STEP 4: Triggering fulfillment option generation...")
-
-      # Re-construct line items for update to satisfy strict validation
-
-      # We need IDs from the current session
-
-      li_1 = next(
-        li
-        for li in checkout_data["line_items"]
-        if li["item"]["id"] == "bouquet_roses"
-      )
-
-      li_2 = next(
-        li
-        for li in checkout_data["line_items"]
-        if li["item"]["id"] == "pot_ceramic"
-      )
-
-      item1_update = item_update_req.ItemUpdateRequest(
-        id="bouquet_roses", title="Red Rose"
-      )
+      logger.info("\nSTEP 4: Selecting Fulfillment Option...")
 
-      line_item1_update = line_item_update_req.LineItemUpdateRequest(
-        id=li_1["id"],
-        quantity=1,
-        item=item1_update,
-      )
-
-      item2_update = item_update_req.ItemUpdateRequest(
-        id="pot_ceramic", title="Ceramic Pot"
-      )
-
-      line_item2_update = line_item_update_req.LineItemUpdateRequest(
-        id=li_2["id"],
-        quantity=2,
-        item=item2_update,
-      )
-
-      # Construct full update payload
-
-      trigger_req = checkout_update_req.CheckoutUpdateRequest(
-        id=checkout_id,
-        line_items=[line_item1_update, line_item2_update],
-        currency=checkout_data["currency"],
-        payment=checkout_data["payment"],
-        fulfillment={"methods": [{"type": "shipping"}]},
-      )
+      logger.info("STEP 4: Triggering fulfillment option generation...")
 
-      trigger_payload = trigger_req.model_dump(
-        mode="json", by_alias=True, exclude_none=True
-      )
+      # Send the full line items again to satisfy strict validation
 
-      url = f"/checkout-sessions/{checkout_id}"
+      trigger_payload = {
+        **base_dict,
+        "fulfillment": {"methods": [{"type": "shipping"}]},
+      }
 
       headers = get_headers()
 
-      response = client.put(url, json=trigger_payload, headers=headers)
+      response = await client.send(
+        build_json_request(
+          client, "PUT", url, orjson.dumps(trigger_payload), headers
+        )
+      )
 
-      checkout_data = response.json()
+      checkout_data = parse_json(response)
 
       # Extract Fulfillment Method ID (though not always needed if we have
       # just 1)
 
       extractions = {}
 
-      if checkout_data.get("fulfillment") and checkout_data["fulfillment"].get(
-        "methods"
-      ):
-        method_id = checkout_data["fulfillment"]["methods"][0]["id"]
-
-        global_replacements[method_id] = "FULFILLMENT_METHOD_ID"
-
-        extractions["FULFILLMENT_METHOD_ID"] = ".fulfillment.methods[0].id"
-
-        # Also destinations
-
-        destinations = checkout_data["fulfillment"]["methods"][0].get(
-          "destinations", []
-        )
-
-        if destinations:
-          # Assuming addr_1 is first
-
-          dest_id = destinations[0]["id"]
-
-          global_replacements[dest_id] = "DESTINATION_ID"
-
-          extractions["DESTINATION_ID"] = (
-            ".fulfillment.methods[0].destinations[0].id"
-          )
+      track_fulfillment_ids(checkout_data, global_replacements, extractions)
 
       if args.export_requests_to:
-        log_interaction(
-          args.export_requests_to,
+        export_interaction(
           "PUT",
           f"{args.server_url}{url}",
           headers,
@@ -784,12 +982,10 @@ def main() -> None:
           "Step 4: Trigger Fulfillment",
           replacements=global_replacements,
           extractions=extractions,
+          response_json=checkout_data,
         )
 
-      if response.status_code == 200:
-        checkout_data = response.json()
-
-      else:
+      if response.status_code != 200:
         logger.warning("Failed to trigger fulfillment: %s", response.text)
 
     if checkout_data.get("fulfillment") and checkout_data["fulfillment"].get(
@@ -806,27 +1002,27 @@ def main() -> None:
 
         # We must send full payload again
 
-        trigger_req.fulfillment = {
-          "methods": [{"type": "shipping", "selected_destination_id": dest_id}]
+        payload = {
+          **base_dict,
+          "fulfillment": {
+            "methods": [
+              {"type": "shipping", "selected_destination_id": dest_id}
+            ]
+          },
         }
 
-        payload = trigger_req.model_dump(
-          mode="json", by_alias=True, exclude_none=True
-        )
-
-        url = f"/checkout-sessions/{checkout_id}"
-
         headers = get_headers()
 
-        response = client.put(
-          url,
-          json=payload,
-          headers=headers,
+        response = await client.send(
+          build_json_request(client, "PUT", url, orjson.dumps(payload), headers)
+        )
+
+        response_json = (
+          parse_json(response) if response.status_code == 200 else None
         )
 
         if args.export_requests_to:
-          log_interaction(
-            args.export_requests_to,
+          export_interaction(
             "PUT",
             f"{args.server_url}{url}",
             headers,
@@ -834,6 +1030,7 @@ def main() -> None:
             response,
             "Step 5: Select Destination",
             replacements=global_replacements,
+            response_json=response_json,
           )
 
         if response.status_code != 200:
@@ -841,7 +1038,7 @@ def main() -> None:
 
           return
 
-        checkout_data = response.json()
+        checkout_data = response_json
 
         # 2. Select Option
 
@@ -852,31 +1049,33 @@ def main() -> None:
 
           logger.info("STEP 6: Selecting option: %s", option_id)
 
-          trigger_req.fulfillment = {
-            "methods": [
-              {
-                "type": "shipping",
-                "selected_destination_id": dest_id,
-                "groups": [{"selected_option_id": option_id}],
-              }
-            ]
+          payload = {
+            **base_dict,
+            "fulfillment": {
+              "methods": [
+                {
+                  "type": "shipping",
+                  "selected_destination_id": dest_id,
+                  "groups": [{"selected_option_id": option_id}],
+                }
+              ]
+            },
           }
 
-          payload = trigger_req.model_dump(
-            mode="json", by_alias=True, exclude_none=True
-          )
-
           headers = get_headers()
 
-          response = client.put(
-            url,
-            json=payload,
-            headers=headers,
+          response = await client.send(
+            build_json_request(
+              client, "PUT", url, orjson.dumps(payload), headers
+            )
+          )
+
+          response_json = (
+            parse_json(response) if response.status_code == 200 else None
           )
 
           if args.export_requests_to:
-            log_interaction(
-              args.export_requests_to,
+            export_interaction(
               "PUT",
               f"{args.server_url}{url}",
               headers,
@@ -884,6 +1083,7 @@ def main() -> None:
               response,
               "Step 6: Select Option",
               replacements=global_replacements,
+              response_json=response_json,
             )
 
           if response.status_code != 200:
@@ -891,7 +1091,7 @@ def main() -> None:
 
             return
 
-          checkout_data = response.json()
+          checkout_data = response_json
 
           logger.info("Fulfillment option selected.")
 
@@ -918,19 +1118,23 @@ def main() -> None:
       return
 
     # Total amount is in tinybars (1 HBAR = 100,000,000 tinybars)
+    # Keep it as an integer all the way into the transfer so it is exact.
     total_tinybars = checkout_data["totals"][-1]["amount"]
-    amount_hbar = total_tinybars / 100_000_000
 
-    logger.info("Total: %d tinybars = %.4f HBAR", total_tinybars, amount_hbar)
+    logger.info(
+      "Total: %d tinybars = %.4f HBAR",
+      total_tinybars,
+      total_tinybars / 100_000_000,
+    )
 
     # Create and sign Hedera transaction
     credential = create_hedera_payment(
-      customer_account_id=hedera_customer_account,
-      customer_private_key=hedera_customer_key,
+      client=hedera_client,
+      customer_acct=hedera_customer_acct,
+      private_key=hedera_private_key,
       merchant_account_id=hedera_merchant_account,
-      amount_hbar=amount_hbar,
+      amount_tinybars=total_tinybars,
       checkout_id=checkout_id,
-      network_name=hedera_network,
     )
 
     final_payload = {
@@ -951,13 +1155,13 @@ def main() -> None:
 
     url = f"/checkout-sessions/{checkout_id}/complete"
 
-    response = client.post(
-      url,
-      json=final_payload,
-      headers=headers,
+    response = await client.send(
+      build_json_request(
+        client, "POST", url, orjson.dumps(final_payload), headers
+      )
     )
 
-    final_data = response.json()
+    final_data = parse_json(response)
 
     extractions = {}
 
@@ -969,8 +1173,7 @@ def main() -> None:
       extractions["ORDER_ID"] = ".order.id"
 
     if args.export_requests_to:
-      log_interaction(
-        args.export_requests_to,
+      export_interaction(
         "POST",
         f"{args.server_url}{url}",
         headers,
@@ -979,6 +1182,7 @@ def main() -> None:
         "Step 7: Complete Checkout (Hedera Payment)",
         replacements=global_replacements,
         extractions=extractions,
+        response_json=final_data,
       )
 
     if response.status_code != 200:
@@ -1017,8 +1221,12 @@ def main() -> None:
     logger.exception("An unexpected error occurred:")
 
   finally:
-    client.close()
+    try:
+      if pending_log is not None:
+        await pending_log
+    finally:
+      await resources.aclose()
 
 
 if __name__ == "__main__":
-  main()
+  asyncio.run(main())
@@ -128,7 +128,7 @@ class CheckoutService:
 
     # Initialize Hedera payment service if configured
     try:
-      self.hedera_service = HederaPaymentService()
+      self.hedera_service = HederaPaymentService.get_instance()
     except (ValueError, Exception) as e:
       logger.info("Hedera payment service not initialized: %s", e)
       self.hedera_service = None
@@ -1202,14 +1202,12 @@ class CheckoutService:
     if total_tinybars == 0:
       raise InvalidRequestError("Checkout total is zero")
 
-    # Convert tinybars to HBAR (1 HBAR = 100,000,000 tinybars)
-    expected_hbar = total_tinybars / 100_000_000
-    logger.info("Processing %.4f HBAR (%d tinybars)", expected_hbar, total_tinybars)
+    logger.info("Processing %d tinybars", total_tinybars)
 
     try:
-      result = self.hedera_service.process_pre_signed_payment(
+      result = await self.hedera_service.process_pre_signed_payment(
         signed_transaction_base64=signed_tx,
-        expected_amount_hbar=expected_hbar,
+        expected_amount_tinybars=total_tinybars,
         checkout_id=checkout.id,
       )
 
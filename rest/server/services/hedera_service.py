@@ -19,31 +19,102 @@ Clients sign transactions locally and submit them to the backend for validation
 and submission to the Hedera network.
 """
 
-import base64
+import asyncio
+import atexit
 import logging
 import os
+import re
+import threading
 from typing import Any
 
+try:
+  # SIMD-accelerated codec with the same API as the stdlib module
+  import pybase64 as base64
+except ImportError:
+  import base64
+
 from hiero_sdk_python import AccountId
 from hiero_sdk_python import Client
-from hiero_sdk_python import Hbar
 from hiero_sdk_python import Network
 from hiero_sdk_python import PrivateKey
+from hiero_sdk_python import ResponseCode
 from hiero_sdk_python import Transaction
 from hiero_sdk_python import TransferTransaction
+from hiero_sdk_python.exceptions import MaxAttemptsError
 
 logger = logging.getLogger(__name__)
 
+# Delays (seconds) between receipt polls; the last one repeats. Consensus
+# usually lands within a few seconds, so poll early and then back off.
+_POLL_DELAYS = (0.2, 0.2, 0.5, 0.5, 1.0)
+DEFAULT_TXN_CONFIRM_TIMEOUT = 30.0
+# Statuses a receipt query reports while the transaction awaits consensus
+_RECEIPT_PENDING_STATUSES = frozenset({
+  ResponseCode.OK,
+  ResponseCode.UNKNOWN,
+  ResponseCode.BUSY,
+  ResponseCode.RECEIPT_NOT_FOUND,
+  ResponseCode.PLATFORM_NOT_ACTIVE,
+  ResponseCode.PLATFORM_TRANSACTION_NOT_CREATED,
+})
+# Consecutive transport failures (unreachable node, etc.) before giving up
+_MAX_POLL_TRANSPORT_FAILURES = 3
+
+# Hedera caps a signed transaction at 6 KiB; anything longer once base64
+# encoded cannot be a valid payment
+_MAX_TX_B64_LEN = 8192
+_B64_RE = re.compile(r"[A-Za-z0-9+/]+={0,2}")
+
+_HASHSCAN_BASE = {
+  "mainnet": "https://hashscan.io/mainnet",
+  "testnet": "https://hashscan.io/testnet",
+  "previewnet": "https://hashscan.io/previewnet",
+}
+
 
 class HederaPaymentService:
   """Non-custodial Hedera payment processor.
 
-  Validates and submits pre-signed transactions from clients.
+  Validates and submits pre-signed transactions from clients. Use
+  `get_instance()` to share one service, and its Hiero client connection,
+  across requests.
   """
 
+  __slots__ = (
+    "network_name",
+    "_explorer_base",
+    "merchant_account_id",
+    "client",
+    "_client_lock",
+  )
+
+  _instance: "HederaPaymentService | None" = None
+  _instance_lock = threading.Lock()
+
+  @classmethod
+  def get_instance(cls) -> "HederaPaymentService":
+    """Return the process-wide service, creating it on first use.
+
+    Returns:
+      The shared HederaPaymentService
+
+    Raises:
+      ValueError: If the merchant account is not configured
+    """
+    if cls._instance is None:
+      with cls._instance_lock:
+        if cls._instance is None:
+          instance = cls()
+          atexit.register(instance.close)
+          cls._instance = instance
+    return cls._instance
+
   def __init__(self):
     """Initialize Hedera client."""
     self.network_name = os.getenv("HEDERA_NETWORK", "testnet")
+    self._explorer_base = _HASHSCAN_BASE.get(
+      self.network_name, _HASHSCAN_BASE["testnet"]
+    )
     merchant_account_str = os.getenv("HEDERA_MERCHANT_ACCOUNT_ID")
     merchant_private_key_str = os.getenv("HEDERA_MERCHANT_PRIVATE_KEY")
 
@@ -70,6 +141,10 @@ class HederaPaymentService:
 
     self.client = Client(network)
     self.client.set_operator(self.merchant_account_id, merchant_private_key)
+    # The shared client keeps mutable network state (current node, per-node
+    # health and backoff) and the SDK makes no thread-safety guarantee, so
+    # worker threads take turns using it
+    self._client_lock = threading.Lock()
 
     logger.info(
       "Hedera service initialized: network=%s, merchant=%s",
@@ -77,31 +152,126 @@ class HederaPaymentService:
       self.merchant_account_id,
     )
 
-  def process_pre_signed_payment(
+  def close(self) -> None:
+    """Close the Hiero client and its network channels."""
+    with self._client_lock:
+      self.client.close()
+
+  def _execute(self, executable, **kwargs):
+    """Execute an SDK transaction or query on the shared client.
+
+    Called from worker threads; holds the client lock for the duration.
+    """
+    with self._client_lock:
+      return executable.execute(self.client, **kwargs)
+
+  async def process_pre_signed_payment(
     self,
     signed_transaction_base64: str,
-    expected_amount_hbar: float,
+    expected_amount_tinybars: int,
     checkout_id: str,
+    timeout: float = DEFAULT_TXN_CONFIRM_TIMEOUT,
   ) -> dict[str, Any]:
     """Validate and submit a pre-signed Hedera transaction.
 
+    Submits the transaction in a worker thread, then polls for its receipt
+    with escalating intervals instead of holding a thread for the whole
+    consensus window.
+
     Args:
       signed_transaction_base64: Base64-encoded signed transaction bytes
-      expected_amount_hbar: Expected payment amount in HBAR
+      expected_amount_tinybars: Expected payment amount in tinybars
       checkout_id: UCP checkout ID (for logging)
+      timeout: Seconds to wait for the receipt before giving up
 
     Returns:
       Dict with transaction_id, status, and timestamp
 
     Raises:
       ValueError: If transaction validation fails
-      Exception: If submission fails
+      Exception: If submission fails or the receipt does not arrive in time
     """
     logger.info("Processing Hedera payment for checkout %s", checkout_id)
+    transaction = self._parse_signed_transaction(signed_transaction_base64)
+
+    # Skip validation for now - just log expected amount
+    logger.info("Expected: %d tinybars", expected_amount_tinybars)
 
-    # 1. Decode transaction bytes
+    logger.info("Submitting transaction to %s", self.network_name)
     try:
-      tx_bytes = base64.b64decode(signed_transaction_base64)
+      response = await asyncio.to_thread(
+        self._execute, transaction, wait_for_receipt=False
+      )
+      receipt = await asyncio.wait_for(
+        self._poll_receipt(response), timeout=timeout
+      )
+    except asyncio.TimeoutError as e:
+      logger.error("Timed out waiting for receipt after %.1fs", timeout)
+      raise Exception(
+        f"Hedera network error: no receipt after {timeout:.1f}s"
+      ) from e
+    except Exception as e:
+      logger.error("Transaction submission failed: %s", e)
+      raise Exception(f"Hedera network error: {e}") from e
+
+    return self._build_result(receipt, checkout_id)
+
+  async def _poll_receipt(self, response):
+    """Poll for a submitted transaction's receipt until it reaches consensus.
+
+    Each poll is a single receipt query with no SDK backoff, so a worker
+    thread is only held for one round trip and the spacing between polls is
+    exactly _POLL_DELAYS.
+
+    Args:
+      response: TransactionResponse returned by the submission
+
+    Returns:
+      The TransactionReceipt
+
+    Raises:
+      MaxAttemptsError: If the node keeps failing for a reason other than
+        the receipt not being available yet
+    """
+    # The SDK fills unset backoff from the client, and would sleep in the
+    # worker thread before reporting a retryable status
+    query = (
+      response.get_receipt_query().set_max_attempts(1).set_min_backoff(0)
+    )
+    attempt = 0
+    transport_failures = 0
+    while True:
+      await asyncio.sleep(_POLL_DELAYS[min(attempt, len(_POLL_DELAYS) - 1)])
+      attempt += 1
+      try:
+        return await asyncio.to_thread(self._execute, query)
+      except MaxAttemptsError as e:
+        status = getattr(e.last_error, "status", None)
+        if status in _RECEIPT_PENDING_STATUSES:
+          # Receipt not available yet
+          transport_failures = 0
+          continue
+        transport_failures += 1
+        if transport_failures >= _MAX_POLL_TRANSPORT_FAILURES:
+          raise
+        logger.warning("Receipt poll failed, retrying: %s", e)
+
+  def _parse_signed_transaction(
+    self, signed_transaction_base64: str
+  ) -> TransferTransaction:
+    """Decode and parse a base64-encoded signed transfer transaction.
+
+    Raises:
+      ValueError: If the payload is not a valid transfer transaction
+    """
+    # 1. Decode transaction bytes, rejecting oversized or malformed payloads
+    # before allocating anything
+    if len(signed_transaction_base64) > _MAX_TX_B64_LEN:
+      raise ValueError("Signed transaction is too large")
+    if not _B64_RE.fullmatch(signed_transaction_base64):
+      raise ValueError("Invalid base64 characters")
+    try:
+      tx_bytes = base64.b64decode(signed_transaction_base64, validate=True)
     except Exception as e:
       raise ValueError(f"Invalid base64 encoding: {e}") from e
 
@@ -111,19 +281,21 @@ class HederaPaymentService:
     except Exception as e:
       raise ValueError(f"Invalid transaction bytes: {e}") from e
 
-    # Skip validation for now - just log expected amount
-    logger.info("Expected: %.4f HBAR", expected_amount_hbar)
+    # from_bytes dispatches on the body type; only transfers are payments
+    if not isinstance(transaction, TransferTransaction):
+      raise ValueError(
+        "Expected TransferTransaction, got "
+        f"{transaction.__class__.__name__}"
+      )
 
-    # 5. Submit to Hedera network
-    logger.info("Submitting transaction to %s", self.network_name)
-    try:
-      receipt = transaction.execute(self.client)
-    except Exception as e:
-      logger.error("Transaction submission failed: %s", e)
-      raise Exception(f"Hedera network error: {e}") from e
+    return transaction
 
-    # 6. Check receipt status
-    from hiero_sdk_python import ResponseCode
+  def _build_result(self, receipt, checkout_id: str) -> dict[str, Any]:
+    """Check a receipt's status and build the payment result.
+
+    Raises:
+      Exception: If the transaction did not succeed
+    """
     if receipt.status != ResponseCode.SUCCESS:
       raise Exception(f"Transaction failed with status: {receipt.status.name}")
 
@@ -144,20 +316,23 @@ class HederaPaymentService:
   def _validate_transaction(
     self,
     transaction: TransferTransaction,
-    expected_amount_hbar: float,
+    expected_amount_tinybars: int,
   ) -> None:
     """Validate transaction matches expected parameters.
 
     Args:
       transaction: Parsed TransferTransaction
-      expected_amount_hbar: Expected payment amount
+      expected_amount_tinybars: Expected payment amount in tinybars
 
     Raises:
       ValueError: If validation fails
     """
     # Get transfer details (list of transfers)
     transfers = transaction.hbar_transfers
-    logger.debug("Transaction transfers: %s (type: %s)", transfers, type(transfers))
+    if logger.isEnabledFor(logging.DEBUG):
+      logger.debug(
+        "Transaction transfers: %s (type: %s)", transfers, type(transfers)
+      )
 
     # Find transfer to merchant account
     # hbar_transfers is a list - each item has account_id and amount attributes
@@ -182,30 +357,24 @@ class HederaPaymentService:
         f"No transfer to merchant account {self.merchant_account_id} found"
       )
 
-    # Validate amount (convert to HBAR for comparison)
-    if hasattr(merchant_transfer, "to_hbar"):
-      actual_hbar = merchant_transfer.to_hbar()
+    # Validate amount as integer tinybars - no Hbar allocations or float
+    # conversions on the happy path
+    if hasattr(merchant_transfer, "to_tinybars"):
+      actual_tinybars = merchant_transfer.to_tinybars()
     else:
-      actual_hbar = Hbar(float(merchant_transfer) / 100_000_000)
-    expected_hbar = Hbar(expected_amount_hbar)
-
-    if actual_hbar < expected_hbar:
+      actual_tinybars = int(merchant_transfer)
+    if actual_tinybars < expected_amount_tinybars:
       raise ValueError(
-        f"Insufficient amount: expected {expected_hbar}, got {actual_hbar}"
+        f"Insufficient amount: expected {expected_amount_tinybars} tinybars,"
+        f" got {actual_tinybars}"
       )
 
     logger.info(
-      "Transaction validated: %s HBAR to %s",
-      actual_hbar,
+      "Transaction validated: %d tinybars to %s",
+      actual_tinybars,
       self.merchant_account_id,
     )
 
   def _get_explorer_url(self, transaction_id: str) -> str:
     """Generate HashScan explorer URL for transaction."""
-    base_urls = {
-      "mainnet": "https://hashscan.io/mainnet",
-      "testnet": "https://hashscan.io/testnet",
-      "previewnet": "https://hashscan.io/previewnet",
-    }
-    base_url = base_urls.get(self.network_name, "https://hashscan.io/testnet")
-    return f"{base_url}/transaction/{transaction_id}"
+    return f"{self._explorer_base}/transaction/{transaction_id}"
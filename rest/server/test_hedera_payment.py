@@ -22,14 +22,27 @@ a test transaction. Requires ECDSA accounts with hex-encoded private keys.
 
 from __future__ import annotations
 
-import base64
 import os
 import sys
 from pathlib import Path
-from typing import TYPE_CHECKING
 
-if TYPE_CHECKING:
-  from hiero_sdk_python import AccountId, PrivateKey
+try:
+  import pybase64 as base64
+except ImportError:
+  import base64
+
+# Missing SDK is reported by main() with install instructions
+try:
+  from hiero_sdk_python import AccountId
+  from hiero_sdk_python import Client
+  from hiero_sdk_python import Network
+  from hiero_sdk_python import PrivateKey
+  from hiero_sdk_python import ResponseCode
+  from hiero_sdk_python import TransferTransaction
+
+  HIERO_AVAILABLE = True
+except ImportError:
+  HIERO_AVAILABLE = False
 
 AMOUNT_HBAR = 1 * (10**8)  # 1 HBAR in tinybars
 
@@ -41,18 +54,24 @@ EXPLORER_URLS = {
 
 
 def load_environment() -> None:
-  """Load environment variables from .env file if available."""
-  try:
-    from dotenv import load_dotenv
-
-    env_path = Path(__file__).parent / ".env"
-    if env_path.exists():
-      load_dotenv(env_path)
-      print(f"Loaded environment from {env_path}")
-    else:
-      print(f"No .env file found at {env_path}")
-  except ImportError:
-    print("python-dotenv not installed, using system environment variables")
+  """Load environment variables from .env file if available.
+
+  The file holds plain KEY=VALUE lines (as written by setup.sh), so it is
+  parsed directly rather than importing python-dotenv. Variables already set
+  in the environment take precedence.
+  """
+  env_path = Path(__file__).parent / ".env"
+  if not env_path.exists():
+    print(f"No .env file found at {env_path}")
+    return
+
+  for line in env_path.read_text().splitlines():
+    line = line.strip()
+    if not line or line.startswith("#") or "=" not in line:
+      continue
+    key, _, value = line.partition("=")
+    os.environ.setdefault(key.strip(), value.strip().strip("\"'"))
+  print(f"Loaded environment from {env_path}")
 
 
 def get_env_or_prompt(
@@ -88,11 +107,13 @@ def parse_accounts(
   customer_key_str: str,
 ) -> tuple[AccountId, AccountId, PrivateKey]:
   """Parse account IDs and private key from string configuration."""
-  from hiero_sdk_python import AccountId, PrivateKey
-
   try:
     merchant_id = AccountId.from_string(merchant_str)
-    customer_id = AccountId.from_string(customer_str)
+    # The customer defaults to the merchant account; don't parse it twice
+    if customer_str == merchant_str:
+      customer_id = merchant_id
+    else:
+      customer_id = AccountId.from_string(customer_str)
     customer_key = PrivateKey.from_string_ecdsa(customer_key_str)
     return merchant_id, customer_id, customer_key
   except Exception as e:
@@ -107,8 +128,6 @@ def create_client(
   operator_key: PrivateKey,
 ):
   """Create and configure the Hedera client."""
-  from hiero_sdk_python import Client, Network
-
   try:
     network = Network(network_name)
     client = Client(network)
@@ -128,8 +147,6 @@ def create_transaction(
   merchant_id: AccountId,
 ):
   """Create and sign a transfer transaction."""
-  from hiero_sdk_python import TransferTransaction
-
   try:
     transaction = (
       TransferTransaction()
@@ -153,16 +170,17 @@ def encode_transaction(transaction) -> str:
   """Encode transaction to base64 for UCP."""
   try:
     tx_bytes = transaction.to_bytes()
-    tx_base64 = base64.b64encode(tx_bytes).decode("utf-8")
+    tx_base64 = base64.b64encode(tx_bytes)
 
     print()
     print("Signed transaction (base64-encoded):")
     print("-" * 50)
-    preview = tx_base64[:80] + "..." if len(tx_base64) > 80 else tx_base64
-    print(preview)
+    preview = tx_base64[:80].decode("ascii")
+    print(preview + "..." if len(tx_base64) > 80 else preview)
     print("-" * 50)
     print(f"Length: {len(tx_base64)} characters")
-    return tx_base64
+    # UCP's signed_transaction field is a string
+    return tx_base64.decode("ascii")
   except Exception as e:
     print(f"Error encoding transaction: {e}")
     sys.exit(1)
@@ -170,14 +188,13 @@ def encode_transaction(transaction) -> str:
 
 def submit_transaction(transaction, client, network_name: str) -> None:
   """Submit transaction to the Hedera network."""
-  from hiero_sdk_python import ResponseCode
-
   print()
   print("Submitting to Hedera network...")
   try:
     receipt = transaction.execute(client)
+    transaction_id = str(receipt.transaction_id)
     print("Transaction submitted")
-    print(f"  Transaction ID: {receipt.transaction_id}")
+    print(f"  Transaction ID: {transaction_id}")
     print()
     print(f"Status: {receipt.status}")
 
@@ -185,7 +202,7 @@ def submit_transaction(transaction, client, network_name: str) -> None:
       print()
       print("Payment successful!")
       base_url = EXPLORER_URLS.get(network_name, EXPLORER_URLS["testnet"])
-      tx_url = f"{base_url}/transaction/{receipt.transaction_id}"
+      tx_url = f"{base_url}/transaction/{transaction_id}"
       print(f"View on HashScan: {tx_url}")
     else:
       print(f"Transaction failed with status: {receipt.status.name}")
@@ -196,37 +213,39 @@ def submit_transaction(transaction, client, network_name: str) -> None:
 
 def print_next_steps() -> None:
   """Print guidance for next steps."""
-  print()
-  print("=" * 50)
-  print("Next steps:")
-  print()
-  print("1. Use this base64-encoded transaction in your UCP payment request:")
-  print("   POST /checkouts/{id}/payments")
-  print('   {"instrument": {"handler_id": "hedera_payment",')
-  print('                   "signed_transaction": "..."}}')
-  print()
-  print("2. Run the full checkout flow with the Python client:")
-  print("   cd ../client/flower_shop && uv run simple_happy_path_client.py")
-  print()
-  print("3. Read the full documentation:")
-  print("   See ../README.md")
+  sys.stdout.write(
+    "\n".join(
+      [
+        "",
+        "=" * 50,
+        "Next steps:",
+        "",
+        "1. Use this base64-encoded transaction in your UCP payment request:",
+        "   POST /checkouts/{id}/payments",
+        '   {"instrument": {"handler_id": "hedera_payment",',
+        '                   "signed_transaction": "..."}}',
+        "",
+        "2. Run the full checkout flow with the Python client:",
+        "   cd ../client/flower_shop && uv run simple_happy_path_client.py",
+        "",
+        "3. Read the full documentation:",
+        "   See ../README.md",
+        "",
+      ]
+    )
+  )
 
 
 def main() -> None:
   """Run the Hedera payment test script."""
-  try:
-    import hiero_sdk_python  # noqa: F401
-  except ImportError:
+  if not HIERO_AVAILABLE:
     print("Error: hiero-sdk-python not installed")
     print("Run: uv sync")
     sys.exit(1)
 
   load_environment()
 
-  print()
-  print("Hedera Payment Handler Test Script")
-  print("=" * 50)
-  print()
+  sys.stdout.write("\nHedera Payment Handler Test Script\n" + "=" * 50 + "\n\n")
 
   network_name = os.getenv("HEDERA_NETWORK", "testnet")
   merchant_account_str = os.getenv("HEDERA_MERCHANT_ACCOUNT_ID", "")
@@ -253,10 +272,11 @@ def main() -> None:
     merchant_account_str, customer_account_str, customer_key_str
   )
 
-  print(f"Network: {network_name}")
-  print(f"Merchant Account: {merchant_id}")
-  print(f"Customer Account: {customer_id}")
-  print()
+  sys.stdout.write(
+    f"Network: {network_name}\n"
+    f"Merchant Account: {merchant_id}\n"
+    f"Customer Account: {customer_id}\n\n"
+  )
 
   client = create_client(network_name, customer_id, customer_key)
   print()
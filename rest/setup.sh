@@ -91,15 +91,35 @@ if ! command -v uv &> /dev/null; then
 fi
 print_success "uv is installed"
 
-# Step 2: Install server dependencies
-print_step "Installing server dependencies..."
-(cd "$SERVER_DIR" && uv sync)
-print_success "Server dependencies installed"
-
-# Step 3: Install client dependencies
-print_step "Installing client dependencies..."
-(cd "$CLIENT_DIR" && uv sync)
-print_success "Client dependencies installed"
+# Steps 2-3: Install server and client dependencies
+# The two syncs are independent and mostly network-bound, so run them in
+# parallel and buffer their output to keep it from interleaving.
+print_step "Installing server and client dependencies..."
+SYNC_LOG_DIR="$(mktemp -d)"
+(cd "$SERVER_DIR" && uv sync) > "$SYNC_LOG_DIR/server.log" 2>&1 &
+SERVER_SYNC_PID=$!
+(cd "$CLIENT_DIR" && uv sync) > "$SYNC_LOG_DIR/client.log" 2>&1 &
+CLIENT_SYNC_PID=$!
+
+SYNC_FAILED=0
+if wait "$SERVER_SYNC_PID"; then
+    print_success "Server dependencies installed"
+else
+    print_error "Server dependency install failed:"
+    cat "$SYNC_LOG_DIR/server.log"
+    SYNC_FAILED=1
+fi
+if wait "$CLIENT_SYNC_PID"; then
+    print_success "Client dependencies installed"
+else
+    print_error "Client dependency install failed:"
+    cat "$SYNC_LOG_DIR/client.log"
+    SYNC_FAILED=1
+fi
+rm -rf "$SYNC_LOG_DIR"
+if [ "$SYNC_FAILED" -ne 0 ]; then
+    exit 1
+fi
 
 # Step 4: Initialize database
 print_step "Initializing sample database..."